@@ -1 +1,7 @@
+from . import cli
 from . import models
+
+
+def _sync_team_memberships(env):
+    """Build the team.membership projection for teams that already exist."""
+    env['team.team'].with_context(active_test=False).search([])._sync_memberships()
@@ -1,6 +1,6 @@
 {
     'name' : 'Approvals Teams',
-    'version' : '18.0.1.0.2',
+    'version' : '18.0.1.0.3',
     'summary': '''This module enables multi-level approval processes across various models in Odoo, 
         allowing users to define custom teams and approvers for streamlined management of approvals in different business processes.
     ''',
@@ -19,12 +19,14 @@
     'maintainer': 'KoderXpert Technologies LLP',
     'website': 'https://koderxpert.com',
     'category': 'Productivity',
-    'depends' : ['base'],
+    'depends' : ['base', 'mail'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/team_view.xml',
         'views/approval_view.xml',
         ],
+    'post_init_hook': '_sync_team_memberships',
     'installable':True,
     'application':True,
     'auto_install':False,
@@ -0,0 +1,2 @@
+from . import teams_bench
+from . import teams_sync
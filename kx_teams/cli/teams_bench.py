@@ -0,0 +1,237 @@
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from psycopg2 import errors
+
+from odoo import api, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+from odoo.tools import config
+
+OPERATIONS = ('submit', 'approve', 'reject', 'unlink')
+MONITORED_TABLES = ('res_company', 'approvals_approvals')
+
+class TeamsBench(Command):
+    """Load benchmark of the approval workflow, to run on a disposable database"""
+    name = 'kx_teams_bench'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog=f'{Path(sys.argv[0]).name} {self.name}',
+            description=self.__doc__,
+        )
+        parser.add_argument('--companies', type=int, default=10, help="companies to generate")
+        parser.add_argument('--users', type=int, default=2000, help="users to generate")
+        parser.add_argument('--teams', type=int, default=1000, help="teams to generate")
+        parser.add_argument('--approvers', type=int, default=3, help="approvers per team")
+        parser.add_argument('--documents', type=int, default=5000, help="partners generated as documents to approve")
+        parser.add_argument('--workers', type=int, default=16, help="concurrent worker threads, each with its own cursor")
+        parser.add_argument('--operations', type=int, default=200, help="operations per worker")
+        parser.add_argument('--mix', default='submit=4,approve=3,reject=1,unlink=1', help="relative weight of each operation")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-setup', action='store_true', help="reuse the data generated by a previous run")
+        args, odoo_args = parser.parse_known_args(cmdargs)
+        config.parse_config(odoo_args)
+        if not config['db_name']:
+            parser.error("a database is required, use -d/--database")
+
+        weights = dict(item.split('=') for item in args.mix.split(','))
+        mix = [operation for operation in OPERATIONS for _i in range(int(weights.get(operation, 0)))]
+        if not mix:
+            parser.error("--mix must give a positive weight to at least one operation")
+
+        # Every worker, the lock monitor and the main thread hold a connection
+        # of the pool for the whole run.
+        config['db_maxconn'] = max(config['db_maxconn'], args.workers + 2)
+        registry = Registry(config['db_name'])
+        if not args.skip_setup:
+            started = time.perf_counter()
+            self._setup(registry, args)
+            print(f"Generated benchmark data in {time.perf_counter() - started:.1f}s")
+        fixture = self._load_fixture(registry)
+
+        stats = BenchStats()
+        stop = threading.Event()
+        monitor = threading.Thread(target=self._monitor_locks, args=(registry, stats, stop))
+        workers = [
+            threading.Thread(target=self._work, args=(registry, fixture, mix, args.operations, random.Random(args.seed + index), stats))
+            for index in range(args.workers)
+        ]
+        monitor.start()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        monitor.join()
+        stats.report(elapsed)
+
+    def _setup(self, registry, args):
+        """Generate companies, users, teams with their approvers and documents."""
+        rng = random.Random(args.seed)
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {
+                'no_reset_password': True,
+                'mail_create_nolog': True,
+                'mail_create_nosubscribe': True,
+                'tracking_disable': True,
+            })
+            companies = env['res.company'].create([{'name': f'KX Bench Company {index}'} for index in range(args.companies)])
+            users = env['res.users'].create([{
+                'name': f'KX Bench User {index}',
+                'login': f'kx_bench_{index}',
+            } for index in range(args.users)])
+            partner_model_id = env['ir.model']._get_id('res.partner')
+            teams = env['team.team'].with_context(defer_membership_sync=True).create([{
+                'name': f'KX Bench Team {index}',
+                'model_ids': [(6, 0, [partner_model_id])],
+                'user_id': (leader := rng.choice(users)).id,
+                'member_ids': [(6, 0, [leader.id, *rng.sample(users.ids, min(5, len(users)))])],
+                'company_ids': [(6, 0, rng.sample(companies.ids, min(2, len(companies))))],
+                'approvers_ids': [
+                    (0, 0, {'user_id': user_id, 'sequence': sequence})
+                    for sequence, user_id in enumerate(rng.sample(users.ids, min(args.approvers, len(users))))
+                ],
+            } for index in range(args.teams)])
+            teams.with_context(defer_membership_sync=False)._sync_memberships()
+            env['res.partner'].create([{'name': f'KX Bench Document {index}'} for index in range(args.documents)])
+
+    def _load_fixture(self, registry):
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            return {
+                'team_ids': env['team.team'].search([('name', '=like', 'KX Bench Team %')]).ids,
+                'user_ids': env['res.users'].search([('login', '=like', 'kx_bench_%')]).ids,
+                'document_ids': env['res.partner'].search([('name', '=like', 'KX Bench Document %')]).ids,
+            }
+
+    def _work(self, registry, fixture, mix, operations, rng, stats):
+        try:
+            cursor = registry.cursor()
+        except Exception as e:
+            stats.add_failure(f'worker without cursor: {type(e).__name__}')
+            return
+        with cursor as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            for _i in range(operations):
+                operation = rng.choice(mix)
+                queries = cr.sql_log_count
+                started = time.perf_counter()
+                try:
+                    done = getattr(self, f'_op_{operation}')(env, fixture, rng)
+                    cr.commit()
+                except errors.SerializationFailure:
+                    cr.rollback()
+                    stats.add_failure('serialization')
+                    continue
+                except errors.DeadlockDetected:
+                    cr.rollback()
+                    stats.add_failure('deadlock')
+                    continue
+                except Exception as e:
+                    cr.rollback()
+                    stats.add_failure(f'{operation} failed: {type(e).__name__}')
+                    continue
+                if done:
+                    stats.add(operation, time.perf_counter() - started, cr.sql_log_count - queries)
+                else:
+                    stats.add_failure(f'{operation} found nothing')
+
+    def _op_submit(self, env, fixture, rng):
+        team = env['team.team'].browse(rng.choice(fixture['team_ids']))
+        return team._request_approval(env['res.partner'].browse(rng.choice(fixture['document_ids'])))
+
+    def _pick_pending(self, env, fixture, rng):
+        return env['approvals.approvals'].search(
+            [('state', '=', 'pending'), ('user_id', '=', rng.choice(fixture['user_ids']))], limit=1,
+        )
+
+    def _op_approve(self, env, fixture, rng):
+        approval = self._pick_pending(env, fixture, rng)
+        approval.action_approve()
+        return approval
+
+    def _op_reject(self, env, fixture, rng):
+        approval = self._pick_pending(env, fixture, rng)
+        approval.write({'rejection_reason': "Rejected by the benchmark"})
+        approval.action_reject()
+        return approval
+
+    def _op_unlink(self, env, fixture, rng):
+        approval = self._pick_pending(env, fixture, rng)
+        approval.unlink()
+        return approval
+
+    def _monitor_locks(self, registry, stats, stop):
+        """Sample the backends waiting on a lock of the monitored tables: row
+        lock waiters hold a tuple lock, table lock waiters an ungranted one."""
+        with registry.cursor() as cr:
+            while not stop.wait(0.05):
+                cr.execute("""
+                    SELECT c.relname, count(DISTINCT l.pid)
+                      FROM pg_locks l
+                      JOIN pg_class c ON c.oid = l.relation
+                      JOIN pg_stat_activity a ON a.pid = l.pid
+                     WHERE a.wait_event_type = 'Lock'
+                       AND (l.locktype = 'tuple' OR NOT l.granted)
+                       AND c.relname IN %s
+                  GROUP BY c.relname
+                """, [MONITORED_TABLES])
+                stats.add_lock_sample(dict(cr.fetchall()))
+                cr.rollback()
+
+class BenchStats:
+    """Thread-safe collection of the benchmark measurements."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.lock_samples = 0
+        self.lock_waits = defaultdict(int)
+        self.lock_waits_max = defaultdict(int)
+
+    def add(self, operation, latency, queries):
+        with self.lock:
+            self.latencies[operation].append(latency)
+            self.queries[operation].append(queries)
+
+    def add_failure(self, kind):
+        with self.lock:
+            self.failures[kind] += 1
+
+    def add_lock_sample(self, waiters):
+        with self.lock:
+            self.lock_samples += 1
+            for table, count in waiters.items():
+                self.lock_waits[table] += 1
+                self.lock_waits_max[table] = max(self.lock_waits_max[table], count)
+
+    def report(self, elapsed):
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        print(f"{total} operations in {elapsed:.1f}s ({total / elapsed:.1f} ops/s)")
+        print(f"{'operation':<10} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        for operation in OPERATIONS:
+            latencies = sorted(self.latencies.get(operation, []))
+            if not latencies:
+                continue
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            queries = statistics.mean(self.queries[operation])
+            print(f"{operation:<10} {len(latencies):>7} {p50:>9.1f} {p99:>9.1f} {queries:>8.1f}")
+        for kind, count in sorted(self.failures.items()):
+            print(f"{kind}: {count}")
+        for table in MONITORED_TABLES:
+            print(
+                f"lock waits on {table}: seen in {self.lock_waits[table]} of {self.lock_samples} samples,"
+                f" at most {self.lock_waits_max[table]} waiting backends"
+            )
@@ -0,0 +1,38 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from odoo import api, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+class TeamsSync(Command):
+    """Synchronize approval teams, members and approvers from a roster"""
+    name = 'kx_teams_sync'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog=f'{Path(sys.argv[0]).name} {self.name}',
+            description=self.__doc__,
+        )
+        parser.add_argument('--source', default='csv', help="roster source, a team.roster _fetch_roster_<source> method")
+        parser.add_argument('--path', required=True, help="roster file given to the source")
+        parser.add_argument('--archive-missing', action='store_true', help="archive teams that are not in the roster")
+        parser.add_argument('--dry-run', action='store_true', help="report the changes and roll them back")
+        args, odoo_args = parser.parse_known_args(cmdargs)
+        config.parse_config(odoo_args)
+        if not config['db_name']:
+            parser.error("a database is required, use -d/--database")
+
+        registry = Registry(config['db_name'])
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            roster = env['team.roster']._fetch_roster(args.source, path=args.path)
+            result = env['team.roster']._sync(roster, archive_missing=args.archive_missing)
+            _logger.info("Team roster synchronized: %(created)s created, %(updated)s updated, %(archived)s archived", result)
+            if args.dry_run:
+                cr.rollback()
@@ -0,0 +1,22 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Copy the thresholds teams used to share through res.company onto the
+    teams themselves, taking the first company of each team, and build the
+    team.membership projection, which the post-init hook only fills on install."""
+    cr.execute("""
+        UPDATE team_team t
+           SET approval = c.approval,
+               approval_validation_amount = c.approval_validation_amount,
+               currency_id = c.currency_id
+          FROM (
+                SELECT DISTINCT ON (rel.team_team_id) rel.team_team_id, rel.res_company_id
+                  FROM res_company_team_team_rel rel
+              ORDER BY rel.team_team_id, rel.res_company_id
+               ) first_company
+          JOIN res_company c ON c.id = first_company.res_company_id
+         WHERE t.id = first_company.team_team_id
+    """)
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['team.team'].with_context(active_test=False).search([])._sync_memberships()
@@ -1,3 +1,7 @@
 from . import approval
+from . import approval_history
 from . import res_company
+from . import team_membership
+from . import team_roster
 from . import team_team
+from . import team_threshold
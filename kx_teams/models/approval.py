@@ -1,19 +1,340 @@
-from odoo import fields, models, _
+import logging
+from collections import defaultdict
+
+from dateutil.relativedelta import relativedelta
+from markupsafe import Markup
+
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import AccessError, UserError
+from odoo.tools import SQL, create_index
+
+_logger = logging.getLogger(__name__)
+
+NOTIFICATION_QUEUE_KEY = 'kx_teams.approval_notifications'
 
 class Approvals(models.Model):
     _name = "approvals.approvals"
+    _order = "sequence, id"
 
-    approver_id = fields.Many2one('team.team')
+    activity_id = fields.Many2one('mail.activity', string="Activity", ondelete='set null', index='btree_not_null')
+    approver_id = fields.Many2one('team.team', index=True)
     action_date = fields.Datetime('Time')
     active = fields.Boolean(string="Active", default=True)
     is_approved = fields.Boolean()
+    is_cancelled = fields.Boolean()
     is_rejected = fields.Boolean()
+    is_waiting = fields.Boolean()
     rejection_reason = fields.Text()
+    res_id = fields.Many2oneReference(string="Document ID", model_field='res_model')
+    res_model = fields.Char(string="Document Model")
     sequence = fields.Integer()
+    state = fields.Selection([
+        ('waiting', 'Waiting'),
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
+    ], compute='_compute_state', store=True)
     user_id = fields.Many2one('res.users', string="User")
 
+    def init(self):
+        # Partial index backing the "what do I need to approve" queue: it only
+        # holds pending rows, so it stays small however large the history grows.
+        create_index(
+            self._cr, 'approvals_approvals_pending_user_idx', self._table,
+            ['user_id', 'res_model'], where="state = 'pending' AND active",
+        )
+        # Lines of a document, as looked up when a level is decided.
+        create_index(
+            self._cr, 'approvals_approvals_document_idx', self._table,
+            ['res_model', 'res_id'], where="res_model IS NOT NULL",
+        )
+        # Team approver templates, as loaded by the team form; document lines
+        # are left out as they stay active for the whole retention period.
+        self._cr.execute("DROP INDEX IF EXISTS approvals_approvals_team_sequence_idx")
+        create_index(
+            self._cr, 'approvals_approvals_team_template_idx', self._table,
+            ['approver_id', 'sequence'], where="res_model IS NULL AND active",
+        )
+        # Decided approvals, oldest first, as scanned by the retention job.
+        create_index(
+            self._cr, 'approvals_approvals_decided_date_idx', self._table,
+            ['action_date'], where="state IN ('approved', 'rejected', 'cancelled')",
+        )
+
+    @api.depends('is_approved', 'is_cancelled', 'is_rejected', 'is_waiting', 'res_model', 'res_id')
+    def _compute_state(self):
+        """Approver lines that are not linked to a document are team templates
+        and stay out of the queue. Lines of a later sequence wait until the
+        previous level is approved."""
+        for approval in self:
+            if approval.is_approved:
+                approval.state = 'approved'
+            elif approval.is_rejected:
+                approval.state = 'rejected'
+            elif approval.is_cancelled:
+                approval.state = 'cancelled'
+            elif approval.res_model and approval.res_id:
+                approval.state = 'waiting' if approval.is_waiting else 'pending'
+            else:
+                approval.state = False
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        approvals = super().create(vals_list)
+        approvals._get_template_teams()._sync_memberships()
+        approvals.filtered(lambda approval: approval.state == 'pending')._enqueue_notifications()
+        return approvals
+
+    def write(self, vals):
+        teams = self._get_template_teams() if {'active', 'approver_id', 'res_model', 'user_id'}.intersection(vals) else self.env['team.team']
+        res = super().write(vals)
+        if teams:
+            (teams | self._get_template_teams())._sync_memberships()
+        if vals.get('is_approved'):
+            self._activate_next_level()
+        if vals.get('is_rejected'):
+            self._cancel_siblings()
+        if vals.get('is_waiting') is False:
+            self.filtered(lambda approval: approval.state == 'pending')._enqueue_notifications()
+        if {'is_approved', 'is_cancelled', 'is_rejected', 'active'}.intersection(vals):
+            decided = self.filtered(lambda approval: approval.activity_id and (approval.state != 'pending' or not approval.active))
+            decided.activity_id.sudo().unlink()
+        return res
+
     def unlink(self):
         teams = self.mapped('approver_id')
+        template_teams = self._get_template_teams()
+        self.activity_id.sudo().unlink()
         res = super().unlink()
         teams._reorder_sequence()
+        template_teams.exists()._sync_memberships()
         return res
+
+    def _get_template_teams(self):
+        """Teams whose approver templates (lines without a document) are in self."""
+        return self.filtered(lambda approval: not approval.res_model).approver_id
+
+    def _get_open_siblings(self):
+        """Pending and waiting lines of the documents of self, in one search."""
+        documents = [approval for approval in self if approval.res_model and approval.res_id]
+        if not documents:
+            return self.browse()
+        return self.search([
+            ('res_model', 'in', list({approval.res_model for approval in documents})),
+            ('res_id', 'in', list({approval.res_id for approval in documents})),
+            ('state', 'in', ('pending', 'waiting')),
+        ]).filtered(lambda sibling: (sibling.res_model, sibling.res_id) in {(approval.res_model, approval.res_id) for approval in documents})
+
+    def _activate_next_level(self):
+        """Once every line of the current sequence of a team and document is
+        approved, make the lines of the next sequence pending."""
+        lines_by_key = defaultdict(list)
+        for sibling in self._get_open_siblings():
+            lines_by_key[sibling.approver_id.id, sibling.res_model, sibling.res_id].append(sibling)
+        to_activate = []
+        for lines in lines_by_key.values():
+            if any(line.state == 'pending' for line in lines):
+                continue
+            next_sequence = min(line.sequence for line in lines)
+            to_activate += [line.id for line in lines if line.sequence == next_sequence]
+        if to_activate:
+            self.browse(to_activate).write({'is_waiting': False})
+
+    def _cancel_siblings(self):
+        """A rejection closes the other open lines of the rejected documents."""
+        siblings = self._get_open_siblings()
+        if siblings:
+            siblings.write({'is_cancelled': True, 'action_date': fields.Datetime.now()})
+
+    def _check_approver(self):
+        if self.env.is_admin():
+            return
+        if any(approval.user_id != self.env.user for approval in self):
+            raise AccessError(_("Only the assigned approver can approve or reject this document."))
+
+    def _enqueue_notifications(self):
+        """Collect pending approvals for the notification stage, which runs
+        once per transaction right before commit."""
+        data = self.env.cr.precommit.data
+        if NOTIFICATION_QUEUE_KEY not in data:
+            data[NOTIFICATION_QUEUE_KEY] = set()
+            self.env.cr.precommit.add(self._flush_notifications)
+        data[NOTIFICATION_QUEUE_KEY].update(self.ids)
+
+    def _flush_notifications(self):
+        approval_ids = self.env.cr.precommit.data.pop(NOTIFICATION_QUEUE_KEY, set())
+        approvals = self.sudo().browse(approval_ids).exists().filtered(
+            lambda approval: approval.state == 'pending' and approval.active and approval.user_id and approval.res_model in self.env
+        )
+        approvals._notify_approvers()
+        self.env.flush_all()
+
+    def _notify_approvers(self):
+        """Notify approvers of all (document, approver) pairs at once: one
+        multi-row activity insert, followers subscribed per document model and
+        approver, and one bus message per user. Users receiving more than the
+        digest threshold get a single summary email instead of one per activity."""
+        digest_threshold = int(self.env['ir.config_parameter'].sudo().get_param('kx_teams.notification_digest_threshold', 20))
+        activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+
+        res_ids_by_model_partner = defaultdict(set)
+        approval_ids_by_user = defaultdict(list)
+        with_activities = []
+        for approval in self:
+            approval_ids_by_user[approval.user_id.id].append(approval.id)
+            if 'activity_ids' in self.env[approval.res_model]._fields:
+                with_activities.append(approval)
+            else:
+                res_ids_by_model_partner[approval.res_model, approval.user_id.partner_id.id].add(approval.res_id)
+
+        # Activities subscribe their user to the document themselves.
+        for (res_model, partner_id), res_ids in res_ids_by_model_partner.items():
+            records = self.env[res_model].browse(res_ids)
+            if hasattr(records, 'message_subscribe'):
+                records.message_subscribe(partner_ids=[partner_id])
+
+        activities = self.env['mail.activity'].with_context(mail_activity_quick_update=True).create([{
+            'activity_type_id': activity_type.id if activity_type else False,
+            'res_model_id': self.env['ir.model']._get_id(approval.res_model),
+            'res_id': approval.res_id,
+            'summary': _('Approval requested'),
+            'user_id': approval.user_id.id,
+        } for approval in with_activities])
+        if activities:
+            self.env.cr.execute(SQL(
+                "UPDATE approvals_approvals AS a SET activity_id = v.activity_id FROM (VALUES %s) AS v(id, activity_id) WHERE a.id = v.id",
+                SQL(", ").join(SQL("(%s, %s)", approval.id, activity.id) for approval, activity in zip(with_activities, activities)),
+            ))
+            self.browse([approval.id for approval in with_activities]).invalidate_recordset(['activity_id'])
+
+        digest_user_ids = set()
+        for user_id, approval_ids in approval_ids_by_user.items():
+            user = self.env['res.users'].browse(user_id)
+            approvals = self.browse(approval_ids)
+            digest = len(approval_ids) > digest_threshold
+            if digest:
+                digest_user_ids.add(user_id)
+                approvals._send_digest(user)
+            user.partner_id._bus_send('kx_teams.approvals', {
+                'count': len(approval_ids),
+                'digest': digest,
+                'approval_ids': approval_ids,
+            })
+        activities.filtered(lambda activity: activity.user_id.id not in digest_user_ids).action_notify()
+
+    def _send_digest(self, user):
+        """Send `user` one notification listing the documents of self."""
+        model_names = {
+            model.model: model.name
+            for model in self.env['ir.model'].sudo().search([('model', 'in', list(set(self.mapped('res_model'))))])
+        }
+        res_ids_by_model = defaultdict(list)
+        for approval in self:
+            res_ids_by_model[approval.res_model].append(approval.res_id)
+        items = Markup().join(
+            Markup("<li>%s: %s</li>") % (model_names.get(res_model, res_model), record.display_name)
+            for res_model, res_ids in res_ids_by_model.items()
+            for record in self.env[res_model].browse(res_ids)
+        )
+        self.env['mail.thread'].sudo().message_notify(
+            partner_ids=user.partner_id.ids,
+            subject=_("%s documents are waiting for your approval", len(self)),
+            body=Markup("<p>%s</p><ul>%s</ul>") % (_("The following documents are waiting for your approval:"), items),
+        )
+
+    @api.model
+    def _cron_archive_decided_approvals(self, auto_commit=True):
+        """Move decided approvals older than the retention period into
+        approvals.history, one batch per transaction, so the live table only
+        keeps pending approvals, team approvers and recent decisions."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        retention_days = int(ICP.get_param('kx_teams.approval_retention_days', 365))
+        batch_size = int(ICP.get_param('kx_teams.approval_archive_batch_size', 10000))
+        limit_date = fields.Datetime.now() - relativedelta(days=retention_days)
+        self.env.flush_all()
+        total = 0
+        Activity = self.env['mail.activity'].sudo()
+        while True:
+            self.env.cr.execute("""
+                WITH archived AS (
+                    DELETE FROM approvals_approvals
+                     WHERE id IN (
+                            SELECT id
+                              FROM approvals_approvals
+                             WHERE state IN ('approved', 'rejected', 'cancelled')
+                               AND action_date < %s
+                          ORDER BY action_date
+                             LIMIT %s
+                               FOR UPDATE SKIP LOCKED
+                           )
+                 RETURNING approver_id, user_id, res_model, res_id, state, sequence, rejection_reason, create_date, action_date, activity_id
+                ),
+                history AS (
+                    INSERT INTO approvals_history (team_id, user_id, res_model, res_id, state, sequence, rejection_reason, request_date, action_date)
+                    SELECT approver_id, user_id, res_model, res_id, state, sequence, rejection_reason, create_date, action_date
+                      FROM archived
+                )
+                SELECT count(*), array_agg(activity_id) FILTER (WHERE activity_id IS NOT NULL)
+                  FROM archived
+            """, (limit_date, batch_size))
+            archived, activity_ids = self.env.cr.fetchone()
+            Activity.browse(activity_ids or []).exists().unlink()
+            total += archived
+            self.invalidate_model()
+            self.env['approvals.history'].invalidate_model()
+            if auto_commit and not tools.config['test_enable']:
+                self.env.cr.commit()
+            if archived < batch_size:
+                break
+        _logger.info("Archived %s decided approvals older than %s", total, limit_date)
+        return total
+
+    def action_approve(self):
+        self._check_approver()
+        if any(approval.state != 'pending' for approval in self):
+            raise UserError(_("Only pending approvals can be approved."))
+        self.write({'is_approved': True, 'is_rejected': False, 'action_date': fields.Datetime.now()})
+
+    def action_reject(self):
+        self._check_approver()
+        if any(approval.state != 'pending' for approval in self):
+            raise UserError(_("Only pending approvals can be rejected."))
+        self.write({'is_approved': False, 'is_rejected': True, 'action_date': fields.Datetime.now()})
+
+    @api.model
+    def _get_pending_counts(self, user_ids):
+        """Return the number of pending approvals per user in a single grouped query."""
+        groups = self._read_group(
+            [('state', '=', 'pending'), ('user_id', 'in', user_ids)],
+            ['user_id'], ['__count'],
+        )
+        return {user.id: count for user, count in groups}
+
+    @api.model
+    def systray_get_approvals(self):
+        """Pending approvals of the current user grouped by document model, for
+        the systray and the approval inbox."""
+        groups = self._read_group(
+            [('state', '=', 'pending'), ('user_id', '=', self.env.uid)],
+            ['res_model'], ['__count'],
+        )
+        models_by_name = {
+            model.model: model.name
+            for model in self.env['ir.model'].sudo().search([('model', 'in', [res_model for res_model, _count in groups])])
+        }
+        return [{
+            'model': res_model,
+            'name': models_by_name.get(res_model, res_model),
+            'pending_count': count,
+        } for res_model, count in groups]
+
+    def action_open_document(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Document'),
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+        }
@@ -0,0 +1,21 @@
+from odoo import fields, models
+
+class ApprovalHistory(models.Model):
+    _name = "approvals.history"
+    _description = "Approval History"
+    _log_access = False
+    _order = "action_date desc, id desc"
+
+    action_date = fields.Datetime('Time', index=True)
+    rejection_reason = fields.Text()
+    request_date = fields.Datetime('Requested On')
+    res_id = fields.Many2oneReference(string="Document ID", model_field='res_model', index=True)
+    res_model = fields.Char(string="Document Model")
+    sequence = fields.Integer()
+    state = fields.Selection([
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
+    ])
+    team_id = fields.Many2one('team.team', string="Team", index=True, ondelete='set null')
+    user_id = fields.Many2one('res.users', string="User", ondelete='set null')
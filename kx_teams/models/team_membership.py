@@ -0,0 +1,26 @@
+from odoo import api, fields, models
+
+class TeamMembership(models.Model):
+    _name = "team.membership"
+    _description = "Team Membership"
+    _log_access = False
+
+    role = fields.Selection([
+        ('leader', 'Leader'),
+        ('member', 'Member'),
+        ('approver', 'Approver'),
+    ], required=True)
+    team_id = fields.Many2one('team.team', required=True, index=True, ondelete='cascade')
+    user_id = fields.Many2one('res.users', required=True, ondelete='cascade')
+
+    _sql_constraints = [
+        ('user_team_role_uniq', 'unique(user_id, team_id, role)', 'A user can hold a role only once per team.'),
+    ]
+
+    @api.model
+    def _get_team_ids(self, user_id=None, roles=None):
+        """Return the ids of the teams of a user through the (user_id, team_id, role) index."""
+        domain = [('user_id', '=', user_id or self.env.uid)]
+        if roles:
+            domain.append(('role', 'in', roles))
+        return [team.id for team, in self.sudo()._read_group(domain, ['team_id'])]
@@ -0,0 +1,154 @@
+import csv
+import re
+
+from odoo import api, models, _
+from odoo.exceptions import UserError
+
+ROSTER_CSV_COLUMNS = ('name', 'leader', 'members', 'approvers')
+
+class TeamRoster(models.AbstractModel):
+    _name = "team.roster"
+    _description = "Team Roster Synchronization"
+
+    @api.model
+    def _fetch_roster(self, source, **options):
+        """Read a full team roster from `source`. Sources are `_fetch_roster_<source>`
+        methods returning a list of dicts with the keys name, leader, members,
+        approvers (ordered) and models, users being given by login."""
+        fetch = getattr(self, f'_fetch_roster_{source}', None)
+        if fetch is None:
+            raise UserError(_("Unknown team roster source: %s", source))
+        return fetch(**options)
+
+    @api.model
+    def _fetch_roster_csv(self, path):
+        """Comma-separated roster with the columns name, leader, members,
+        approvers and optionally models, the values of a multi-valued cell being
+        separated by spaces or semicolons."""
+        def split(value):
+            return [item for item in re.split(r'[\s;]+', value or '') if item]
+
+        # utf-8-sig strips the byte order mark spreadsheet exports start with.
+        with open(path, newline='', encoding='utf-8-sig') as roster_file:
+            reader = csv.DictReader(roster_file)
+            missing = [column for column in ROSTER_CSV_COLUMNS if column not in (reader.fieldnames or [])]
+            if missing:
+                raise UserError(_(
+                    "The team roster %(path)s lacks the columns %(columns)s. Its header is: %(header)s",
+                    path=path, columns=", ".join(missing), header=", ".join(reader.fieldnames or []),
+                ))
+            return [{
+                'name': row['name'].strip(),
+                'leader': (row.get('leader') or '').strip(),
+                'members': split(row.get('members')),
+                'approvers': split(row.get('approvers')),
+                'models': split(row.get('models')),
+            } for row in reader if (row.get('name') or '').strip()]
+
+    @api.model
+    def _sync(self, roster, archive_missing=False):
+        """Apply `roster` to the teams, matched by name. The current state is
+        loaded in a few reads and diffed in memory, so only the teams whose
+        leader, members, approvers or models changed are written; new teams are
+        created in one batch. Memberships are rebuilt once at the end."""
+        if archive_missing and not roster:
+            raise UserError(_("The team roster is empty, archiving the missing teams would archive all of them."))
+        Team = self.env['team.team'].with_context(active_test=False, defer_membership_sync=True)
+        teams = Team.search([])
+        teams_by_name = {}
+        for team in teams.read(['name', 'active', 'user_id', 'member_ids', 'model_ids'], load=False):
+            if team['name'] in teams_by_name:
+                raise UserError(_("Several teams are named %s, the roster cannot be matched to them.", team['name']))
+            teams_by_name[team['name']] = team
+        roster_names = set()
+        for row in roster:
+            if row['name'] in roster_names:
+                raise UserError(_("The team %s appears more than once in the roster.", row['name']))
+            roster_names.add(row['name'])
+        approvers_by_team = {}
+        for approver in self.env['approvals.approvals'].search_read(
+            [('approver_id', 'in', teams.ids), ('res_model', '=', False)], ['approver_id', 'user_id', 'sequence'], load=False,
+        ):
+            approvers_by_team.setdefault(approver['approver_id'], []).append(approver)
+
+        logins = {login for row in roster for login in [row['leader'], *row['members'], *row['approvers']] if login}
+        user_ids_by_login = {
+            user['login']: user['id']
+            for user in self.env['res.users'].with_context(active_test=False).search_read([('login', 'in', list(logins))], ['login'])
+        }
+        model_names = {model for row in roster for model in row['models']}
+        model_ids_by_name = {
+            model['model']: model['id']
+            for model in self.env['ir.model'].search_read([('model', 'in', list(model_names))], ['model'])
+        }
+        missing = sorted((logins - user_ids_by_login.keys()) | (model_names - model_ids_by_name.keys()))
+        if missing:
+            raise UserError(_("The team roster refers to unknown users or models: %s", ", ".join(missing)))
+
+        create_vals = []
+        updates = []
+        for row in roster:
+            leader_id = user_ids_by_login.get(row['leader'], False)
+            member_ids = {user_ids_by_login[login] for login in row['members']}
+            if leader_id:
+                member_ids.add(leader_id)
+            approver_ids = [user_ids_by_login[login] for login in row['approvers']]
+            model_ids = {model_ids_by_name[model] for model in row['models']}
+            team = teams_by_name.get(row['name'])
+            if not team:
+                if not leader_id:
+                    raise UserError(_("The new team %s has no leader in the roster.", row['name']))
+                vals = {
+                    'name': row['name'],
+                    'user_id': leader_id,
+                    'member_ids': [(6, 0, sorted(member_ids))],
+                    'approvers_ids': [(0, 0, {'user_id': user_id, 'sequence': sequence}) for sequence, user_id in enumerate(approver_ids)],
+                }
+                if model_ids:
+                    vals['model_ids'] = [(6, 0, sorted(model_ids))]
+                create_vals.append(vals)
+                continue
+
+            if not leader_id:
+                member_ids.add(team['user_id'])
+            vals = {}
+            if not team['active']:
+                vals['active'] = True
+            if leader_id and team['user_id'] != leader_id:
+                vals['user_id'] = leader_id
+            if set(team['member_ids']) != member_ids:
+                vals['member_ids'] = [(6, 0, sorted(member_ids))]
+            if model_ids and set(team['model_ids']) != model_ids:
+                vals['model_ids'] = [(6, 0, sorted(model_ids))]
+            approver_commands = self._diff_approvers(approvers_by_team.get(team['id'], []), approver_ids)
+            if approver_commands:
+                vals['approvers_ids'] = approver_commands
+            if vals:
+                updates.append((team['id'], vals))
+
+        created = Team.create(create_vals)
+        for team_id, vals in updates:
+            Team.browse(team_id).write(vals)
+        archived = Team.browse()
+        if archive_missing:
+            archived = teams.filtered(lambda team: team.active and team.name not in roster_names)
+            archived.write({'active': False})
+
+        touched = created | Team.browse([team_id for team_id, _vals in updates]) | archived
+        touched.with_context(defer_membership_sync=False)._sync_memberships()
+        return {'created': len(created), 'updated': len(updates), 'archived': len(archived)}
+
+    @api.model
+    def _diff_approvers(self, current, approver_ids):
+        """Commands turning the approver lines `current` into `approver_ids`, in order."""
+        current = sorted(current, key=lambda approver: (approver['sequence'] or 0, approver['id']))
+        commands = []
+        for sequence, user_id in enumerate(approver_ids):
+            if sequence < len(current):
+                approver = current[sequence]
+                if approver['user_id'] != user_id or approver['sequence'] != sequence:
+                    commands.append((1, approver['id'], {'user_id': user_id, 'sequence': sequence}))
+            else:
+                commands.append((0, 0, {'user_id': user_id, 'sequence': sequence}))
+        commands += [(2, approver['id']) for approver in current[len(approver_ids):]]
+        return commands
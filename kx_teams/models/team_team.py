@@ -1,4 +1,5 @@
-from odoo import api, fields, models
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
 
 class Team(models.Model):
     _name = "team.team"
@@ -18,17 +19,128 @@ class Team(models.Model):
         return [(6, 0, model_ids)] if model_ids else []
 
     active = fields.Boolean(string="Active", default=True)
-    approval = fields.Boolean(string="Based on Amount", related='company_ids.approval', readonly=False)
-    approval_validation_amount = fields.Monetary(string="Minimum Amount", related='company_ids.approval_validation_amount', currency_field='company_currency_id', readonly=False)
-    approvers_ids = fields.One2many('approvals.approvals', 'approver_id', string="Approvers")
-    company_currency_id = fields.Many2one('res.currency', related='company_ids.currency_id', string="Company Currency", readonly=True)
+    approval_approved_count = fields.Integer(string="Approved", compute='_compute_approval_stats')
+    approval_decision_hours = fields.Float(string="Average Decision Time (Hours)", compute='_compute_approval_stats')
+    approval_pending_count = fields.Integer(string="Pending", compute='_compute_approval_stats')
+    approval_rejected_count = fields.Integer(string="Rejected", compute='_compute_approval_stats')
+    approval = fields.Boolean(string="Based on Amount")
+    approval_validation_amount = fields.Monetary(string="Minimum Amount", currency_field='currency_id', default=5000)
+    approvers_ids = fields.One2many('approvals.approvals', 'approver_id', string="Approvers", domain=[('res_model', '=', False)])
     company_ids = fields.Many2many('res.company', default=lambda self: self.env.company.ids)
+    currency_id = fields.Many2one('res.currency', string="Currency", required=True, default=lambda self: self.env.company.currency_id)
+    is_my_team = fields.Boolean(string="My Team", compute='_compute_is_my_team', search='_search_is_my_team')
     model_ids = fields.Many2many('ir.model', string='Models', default=_default_model_ids)
     member_ids = fields.Many2many('res.users', string="Team Members")
     name = fields.Char(string="Team Name", required=True)
     sequence = fields.Integer(string='Sequence')
+    threshold_ids = fields.One2many('team.threshold', 'team_id', string="Thresholds")
     user_id = fields.Many2one('res.users', string="Team Leader", required=True)
 
+    def _compute_approval_stats(self):
+        """Aggregate the live approvals of all teams of the recordset in a
+        single grouped query. Approvals archived to approvals.history by the
+        retention job are not counted, so renders never scan the archive."""
+        team_ids = tuple(self._origin.ids)
+        stats = {}
+        if team_ids:
+            self.env['approvals.approvals'].flush_model(['action_date', 'active', 'approver_id', 'state'])
+            self.env.cr.execute("""
+                SELECT approver_id,
+                       count(*) FILTER (WHERE state = 'pending'),
+                       count(*) FILTER (WHERE state = 'approved'),
+                       count(*) FILTER (WHERE state = 'rejected'),
+                       avg(EXTRACT(EPOCH FROM action_date - create_date) / 3600) FILTER (WHERE state IN ('approved', 'rejected'))
+                  FROM approvals_approvals
+                 WHERE approver_id IN %s AND state IS NOT NULL AND active
+              GROUP BY approver_id
+            """, [team_ids])
+            stats = {team_id: values for team_id, *values in self.env.cr.fetchall()}
+        for team in self:
+            pending, approved, rejected, decision_hours = stats.get(team._origin.id, (0, 0, 0, 0.0))
+            team.approval_pending_count = pending
+            team.approval_approved_count = approved
+            team.approval_rejected_count = rejected
+            team.approval_decision_hours = float(decision_hours or 0.0)
+
+    def _compute_is_my_team(self):
+        my_team_ids = set(self.env['team.membership']._get_team_ids())
+        for team in self:
+            team.is_my_team = team._origin.id in my_team_ids
+
+    def _search_is_my_team(self, operator, value):
+        if operator not in ('=', '!='):
+            return NotImplemented
+        positive = (operator == '=') == bool(value)
+        return [('id', 'in' if positive else 'not in', self.env['team.membership']._get_team_ids())]
+
+    _membership_fields = {'active', 'approvers_ids', 'member_ids', 'user_id'}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        teams = super().create(vals_list)
+        teams._sync_memberships()
+        return teams
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._membership_fields.intersection(vals):
+            self._sync_memberships()
+        return res
+
+    def _sync_memberships(self):
+        """Bring the team.membership projection of these teams in line with
+        their leader, members and approvers, touching only the rows that changed.
+        Bulk operations set `defer_membership_sync` and sync once at the end."""
+        if self.env.context.get('defer_membership_sync'):
+            return
+        expected = set()
+        for team in self.filtered('active'):
+            if team.user_id:
+                expected.add((team.user_id.id, team.id, 'leader'))
+            expected.update((user_id, team.id, 'member') for user_id in team.member_ids.ids)
+            expected.update((approver.user_id.id, team.id, 'approver') for approver in team.approvers_ids if approver.user_id)
+        Membership = self.env['team.membership'].sudo()
+        current = {
+            (membership.user_id.id, membership.team_id.id, membership.role): membership.id
+            for membership in Membership.search([('team_id', 'in', self.ids)])
+        }
+        Membership.browse([membership_id for key, membership_id in current.items() if key not in expected]).unlink()
+        Membership.create([
+            {'user_id': user_id, 'team_id': team_id, 'role': role}
+            for user_id, team_id, role in expected - current.keys()
+        ])
+
+    def _get_validation_amount(self, model_name, currency, company=None):
+        """Return the minimum amount for double validation of a `model_name`
+        document in `currency`. A threshold of the model is preferred, converted
+        from another currency if needed, then a currency-wide threshold, then
+        the team amount. Amounts are converted at the rates of `company`, the
+        document's company, defaulting to the current one."""
+        self.ensure_one()
+        thresholds = self.env['team.threshold']._get_threshold_map()
+        company = company or self.env.company
+        date = fields.Date.context_today(self)
+        amounts = thresholds.get((self.id, model_name), {})
+        if currency.id in amounts:
+            return amounts[currency.id]
+        if amounts:
+            currency_id = self.currency_id.id if self.currency_id.id in amounts else min(amounts)
+            return self.env['res.currency'].browse(currency_id)._convert(amounts[currency_id], currency, company, date)
+        amounts = thresholds.get((self.id, False), {})
+        if currency.id in amounts:
+            return amounts[currency.id]
+        return self.currency_id._convert(self.approval_validation_amount, currency, company, date)
+
+    def _requires_approval(self, record):
+        """Documents without an amount always go through approval; with
+        "Based on Amount", the others only from the team threshold on."""
+        self.ensure_one()
+        if not self.approval or 'amount_total' not in record._fields:
+            return True
+        company = record.company_id if 'company_id' in record._fields and record.company_id else self.env.company
+        currency = record.currency_id if 'currency_id' in record._fields and record.currency_id else company.currency_id
+        return record.amount_total >= self._get_validation_amount(record._name, currency, company)
+
     def _reorder_sequence(self):
         """Reorder approvers' sequence starting from 0 within each team."""
         for team in self:
@@ -36,10 +148,34 @@ class Team(models.Model):
             for idx, approver in enumerate(approvers):
                 approver.sequence = idx
 
+    def _request_approval(self, records):
+        """Queue one approval per (document, approver) of the team. Only the
+        approvers of the lowest sequence are pending, the others wait for the
+        previous level to approve. Documents the team already has open lines
+        for are skipped, so resubmitting does not queue them twice."""
+        self.ensure_one()
+        if records and records._name not in self.model_ids.mapped('model'):
+            raise UserError(_("The team %(team)s does not approve %(model)s documents.", team=self.name, model=records._description))
+        open_res_ids = set(self.env['approvals.approvals'].search([
+            ('approver_id', '=', self.id),
+            ('res_model', '=', records._name),
+            ('res_id', 'in', records.ids),
+            ('state', 'in', ('pending', 'waiting')),
+        ]).mapped('res_id'))
+        records = records.filtered(lambda record: record.id not in open_res_ids)
+        approvers = self.approvers_ids.filtered('user_id')
+        first_sequence = min(approvers.mapped('sequence'), default=0)
+        return self.env['approvals.approvals'].create([{
+            'approver_id': self.id,
+            'is_waiting': approver.sequence != first_sequence,
+            'res_model': record._name,
+            'res_id': record.id,
+            'sequence': approver.sequence,
+            'user_id': approver.user_id.id,
+        } for record in records if self._requires_approval(record) for approver in approvers])
+
     @api.onchange('user_id')
     def _onchange_user_id(self):
         """Ensure the selected team leader is always included in the members list."""
         if self.user_id:
-            member_ids = set(self.member_ids.ids)
-            member_ids.add(self.user_id.id)
-            self.member_ids = [(6, 0, list(member_ids))]
+            self.member_ids |= self.user_id
@@ -0,0 +1,54 @@
+from odoo import api, fields, models, tools
+
+class TeamThreshold(models.Model):
+    _name = "team.threshold"
+    _description = "Team Approval Threshold"
+
+    amount = fields.Monetary(string="Minimum Amount", currency_field='currency_id', required=True)
+    currency_id = fields.Many2one('res.currency', string="Currency", required=True, default=lambda self: self.env.company.currency_id)
+    model_id = fields.Many2one('ir.model', string="Model", ondelete='cascade')
+    team_id = fields.Many2one('team.team', required=True, index=True, ondelete='cascade')
+
+    _sql_constraints = [
+        ('team_model_currency_uniq', 'unique(team_id, model_id, currency_id)', 'A team can only have one threshold per model and currency.'),
+    ]
+
+    def init(self):
+        # model_id is NULL for currency-wide thresholds, and NULLs never clash
+        # in the unique constraint above.
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS team_threshold_team_currency_uniq
+                ON team_threshold (team_id, currency_id)
+             WHERE model_id IS NULL
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        thresholds = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return thresholds
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_threshold_map(self):
+        """Map (team_id, model) to {currency_id: minimum amount}, model being False for currency-wide thresholds."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT t.team_id, m.model, t.currency_id, t.amount
+              FROM team_threshold t
+         LEFT JOIN ir_model m ON m.id = t.model_id
+        """)
+        thresholds = {}
+        for team_id, model, currency_id, amount in self.env.cr.fetchall():
+            thresholds.setdefault((team_id, model or False), {})[currency_id] = amount
+        return thresholds
@@ -0,0 +1,3 @@
+from . import test_approval_retention
+from . import test_approval_workflow
+from . import test_team_roster
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalRetention(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('kx_teams.approval_retention_days', 30)
+        cls.env['ir.config_parameter'].sudo().set_param('kx_teams.approval_archive_batch_size', 2)
+        cls.user = cls.env['res.users'].with_context(no_reset_password=True).create({
+            'name': 'Retention Approver',
+            'login': 'retention_approver',
+        })
+        cls.team = cls.env['team.team'].create({
+            'name': 'Retention Team',
+            'user_id': cls.user.id,
+            'model_ids': [(6, 0, [cls.env['ir.model']._get_id('res.partner')])],
+            'approvers_ids': [(0, 0, {'user_id': cls.user.id, 'sequence': 0})],
+        })
+        cls.documents = cls.env['res.partner'].create([{'name': f'Retention Document {index}'} for index in range(8)])
+        cls.old_date = fields.Datetime.now() - timedelta(days=60)
+        cls.recent_date = fields.Datetime.now() - timedelta(days=5)
+
+    def _approval(self, document, **vals):
+        return self.env['approvals.approvals'].create({
+            'approver_id': self.team.id,
+            'res_model': document._name,
+            'res_id': document.id,
+            'user_id': self.user.id,
+            **vals,
+        })
+
+    def test_archive_decided_approvals(self):
+        documents = iter(self.documents)
+        activity = self.env['mail.activity'].create({
+            'res_model_id': self.env['ir.model']._get_id('res.partner'),
+            'res_id': self.documents[0].id,
+            'user_id': self.user.id,
+        })
+        old = self._approval(next(documents), is_approved=True, action_date=self.old_date, activity_id=activity.id)
+        old |= self._approval(next(documents), is_approved=True, action_date=self.old_date)
+        old |= self._approval(next(documents), is_rejected=True, action_date=self.old_date, rejection_reason="Too expensive")
+        old |= self._approval(next(documents), is_cancelled=True, action_date=self.old_date)
+        old |= self._approval(next(documents), is_approved=True, action_date=self.old_date)
+        kept = self._approval(next(documents), is_approved=True, action_date=self.recent_date)
+        kept |= self._approval(next(documents))
+        kept |= self._approval(next(documents), is_waiting=True)
+        kept |= self.team.approvers_ids
+        old_values = {(approval.res_id, approval.state) for approval in old}
+
+        archived = self.env['approvals.approvals']._cron_archive_decided_approvals(auto_commit=False)
+
+        # 5 rows with a batch size of 2 take three batches.
+        self.assertEqual(archived, 5)
+        self.assertFalse(old.exists())
+        self.assertEqual(kept.exists(), kept)
+        self.assertEqual(kept.mapped('state'), ['approved', 'pending', 'waiting', False])
+        self.assertFalse(activity.exists())
+        history = self.env['approvals.history'].search([('team_id', '=', self.team.id)])
+        self.assertEqual({(line.res_id, line.state) for line in history}, old_values)
+        self.assertEqual(history.filtered(lambda line: line.state == 'rejected').rejection_reason, "Too expensive")
+        self.assertTrue(all(line.request_date and line.action_date for line in history))
+        self.assertEqual(self.env['approvals.approvals']._cron_archive_decided_approvals(auto_commit=False), 0)
@@ -0,0 +1,78 @@
+from odoo.addons.mail.tests.common import mail_new_test_user
+from odoo.exceptions import AccessError, UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalWorkflow(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first, cls.second, cls.third = (
+            mail_new_test_user(cls.env, login=f'workflow_approver_{index}', groups='base.group_user')
+            for index in range(3)
+        )
+        cls.team = cls.env['team.team'].create({
+            'name': 'Workflow Team',
+            'user_id': cls.first.id,
+            'model_ids': [(6, 0, [cls.env['ir.model']._get_id('res.partner')])],
+            'approvers_ids': [
+                (0, 0, {'user_id': cls.first.id, 'sequence': 0}),
+                (0, 0, {'user_id': cls.second.id, 'sequence': 1}),
+                (0, 0, {'user_id': cls.third.id, 'sequence': 1}),
+            ],
+        })
+        cls.document = cls.env['res.partner'].create({'name': 'Workflow Document'})
+
+    def _line(self, approvals, user):
+        return approvals.filtered(lambda approval: approval.user_id == user)
+
+    def test_request_only_first_level_pending(self):
+        approvals = self.team._request_approval(self.document)
+        self.assertEqual(len(approvals), 3)
+        self.assertEqual(self._line(approvals, self.first).state, 'pending')
+        self.assertEqual((approvals - self._line(approvals, self.first)).mapped('state'), ['waiting', 'waiting'])
+
+    def test_approve_activates_next_level(self):
+        approvals = self.team._request_approval(self.document)
+        self._line(approvals, self.first).with_user(self.first).action_approve()
+        self.assertEqual(self._line(approvals, self.second).state, 'pending')
+        self.assertEqual(self._line(approvals, self.third).state, 'pending')
+
+    def test_level_waits_for_all_its_approvers(self):
+        approvals = self.team._request_approval(self.document)
+        self._line(approvals, self.first).action_approve()
+        self._line(approvals, self.second).with_user(self.second).action_approve()
+        self.assertEqual(self._line(approvals, self.second).state, 'approved')
+        self.assertEqual(self._line(approvals, self.third).state, 'pending')
+
+    def test_reject_cancels_siblings(self):
+        approvals = self.team._request_approval(self.document)
+        self._line(approvals, self.first).with_user(self.first).action_reject()
+        self.assertEqual(self._line(approvals, self.first).state, 'rejected')
+        self.assertEqual((approvals - self._line(approvals, self.first)).mapped('state'), ['cancelled', 'cancelled'])
+        self.assertFalse(self.env['approvals.approvals']._get_pending_counts([self.second.id, self.third.id]))
+
+    def test_only_assigned_approver_can_decide(self):
+        approvals = self.team._request_approval(self.document)
+        first_line = self._line(approvals, self.first)
+        with self.assertRaises(AccessError):
+            first_line.with_user(self.second).action_approve()
+        with self.assertRaises(AccessError):
+            first_line.with_user(self.second).action_reject()
+        self.assertEqual(first_line.state, 'pending')
+
+    def test_only_pending_lines_can_be_decided(self):
+        approvals = self.team._request_approval(self.document)
+        with self.assertRaises(UserError):
+            self._line(approvals, self.second).with_user(self.second).action_approve()
+
+    def test_resubmit_does_not_duplicate(self):
+        self.team._request_approval(self.document)
+        self.assertFalse(self.team._request_approval(self.document))
+        self.assertEqual(self.env['approvals.approvals'].search_count([('res_model', '=', 'res.partner'), ('res_id', '=', self.document.id)]), 3)
+
+    def test_unconfigured_model_is_refused(self):
+        with self.assertRaises(UserError):
+            self.team._request_approval(self.env['res.country'].search([], limit=1))
@@ -0,0 +1,164 @@
+import os
+import tempfile
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestTeamRoster(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = cls.env['res.users'].with_context(no_reset_password=True).create([
+            {'name': f'Roster User {index}', 'login': f'roster_user_{index}'}
+            for index in range(5)
+        ])
+        cls.logins = cls.users.mapped('login')
+        cls.Roster = cls.env['team.roster']
+
+    def _row(self, name, leader, members=(), approvers=(), models=()):
+        return {
+            'name': name,
+            'leader': leader,
+            'members': list(members),
+            'approvers': list(approvers),
+            'models': list(models),
+        }
+
+    def _write_csv(self, content, encoding='utf-8'):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', encoding=encoding, newline='') as roster_file:
+            roster_file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _team(self, name):
+        return self.env['team.team'].with_context(active_test=False).search([('name', '=', name)])
+
+    def _approver_users(self, team):
+        return team.approvers_ids.sorted('sequence').mapped('user_id')
+
+    def assertMembershipsConsistent(self, teams):
+        for team in teams:
+            expected = set()
+            if team.active:
+                expected.add((team.user_id.id, 'leader'))
+                expected.update((user.id, 'member') for user in team.member_ids)
+                expected.update((approver.user_id.id, 'approver') for approver in team.approvers_ids)
+            memberships = self.env['team.membership'].search([('team_id', '=', team.id)])
+            self.assertEqual({(membership.user_id.id, membership.role) for membership in memberships}, expected)
+
+    def test_sync_creates_teams(self):
+        u0, u1, u2, u3, _u4 = self.users
+        result = self.Roster._sync([
+            self._row('Roster Sales', u0.login, [u1.login], [u2.login, u3.login], ['res.partner']),
+        ])
+        self.assertEqual(result, {'created': 1, 'updated': 0, 'archived': 0})
+        team = self._team('Roster Sales')
+        self.assertEqual(team.user_id, u0)
+        self.assertEqual(team.member_ids, u0 | u1)
+        self.assertEqual(self._approver_users(team), u2 | u3)
+        self.assertEqual(team.model_ids.mapped('model'), ['res.partner'])
+        self.assertMembershipsConsistent(team)
+
+    def test_sync_without_changes_is_a_noop(self):
+        u0, u1, u2, _u3, _u4 = self.users
+        roster = [self._row('Roster Noop', u0.login, [u1.login], [u2.login])]
+        self.Roster._sync(roster)
+        result = self.Roster._sync(roster)
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'archived': 0})
+
+    def test_sync_updates_leader_and_members(self):
+        u0, u1, u2, u3, _u4 = self.users
+        self.Roster._sync([self._row('Roster Update', u0.login, [u1.login])])
+        result = self.Roster._sync([self._row('Roster Update', u2.login, [u3.login])])
+        self.assertEqual(result['updated'], 1)
+        team = self._team('Roster Update')
+        self.assertEqual(team.user_id, u2)
+        self.assertEqual(team.member_ids, u2 | u3)
+        self.assertMembershipsConsistent(team)
+
+    def test_sync_without_leader_keeps_current_leader(self):
+        u0, u1, u2, _u3, _u4 = self.users
+        self.Roster._sync([self._row('Roster Leader', u0.login, [u1.login])])
+        self.Roster._sync([self._row('Roster Leader', '', [u2.login])])
+        team = self._team('Roster Leader')
+        self.assertEqual(team.user_id, u0)
+        self.assertEqual(team.member_ids, u0 | u2)
+        self.assertMembershipsConsistent(team)
+
+    def test_sync_reorders_and_removes_approvers(self):
+        u0, u1, u2, u3, _u4 = self.users
+        self.Roster._sync([self._row('Roster Approvers', u0.login, approvers=[u1.login, u2.login, u3.login])])
+        team = self._team('Roster Approvers')
+        self.Roster._sync([self._row('Roster Approvers', u0.login, approvers=[u3.login, u1.login])])
+        self.assertEqual(self._approver_users(team).ids, [u3.id, u1.id])
+        self.assertEqual(team.approvers_ids.sorted('sequence').mapped('sequence'), [0, 1])
+        self.assertMembershipsConsistent(team)
+
+    def test_sync_archives_missing_teams(self):
+        u0, u1, _u2, _u3, _u4 = self.users
+        self.Roster._sync([
+            self._row('Roster Kept', u0.login),
+            self._row('Roster Dropped', u1.login),
+        ])
+        result = self.Roster._sync([self._row('Roster Kept', u0.login)], archive_missing=True)
+        self.assertEqual(result['created'], 0)
+        self.assertGreaterEqual(result['archived'], 1)
+        dropped = self._team('Roster Dropped')
+        self.assertFalse(dropped.active)
+        self.assertTrue(self._team('Roster Kept').active)
+        self.assertMembershipsConsistent(dropped)
+        self.assertFalse(self.env['team.membership'].search([('team_id', '=', dropped.id)]))
+
+    def test_my_teams_use_membership(self):
+        u0, u1, u2, u3, _u4 = self.users
+        self.Roster._sync([
+            self._row('Roster Mine', u0.login, [u1.login], [u2.login]),
+            self._row('Roster Other', u3.login),
+        ])
+        mine = self._team('Roster Mine')
+        for user in (u0, u1, u2):
+            self.assertEqual(self.env['team.membership']._get_team_ids(user.id), mine.ids)
+            self.assertEqual(self.env['team.team'].with_user(user).search([('is_my_team', '=', True)]), mine)
+        self.assertEqual(self.env['team.membership']._get_team_ids(u1.id, roles=['approver']), [])
+
+    def test_sync_rejects_duplicate_names(self):
+        u0, _u1, _u2, _u3, _u4 = self.users
+        with self.assertRaises(UserError):
+            self.Roster._sync([self._row('Roster Twice', u0.login), self._row('Roster Twice', u0.login)])
+        self.env['team.team'].create([{'name': 'Roster Duplicate', 'user_id': u0.id}] * 2)
+        with self.assertRaises(UserError):
+            self.Roster._sync([self._row('Roster Duplicate', u0.login)])
+
+    def test_csv_with_byte_order_mark(self):
+        u0, u1, u2, _u3, _u4 = self.users
+        path = self._write_csv(
+            f"name,leader,members,approvers,models\nRoster CSV,{u0.login},{u1.login},{u2.login},res.partner\n",
+            encoding='utf-8-sig',
+        )
+        roster = self.Roster._fetch_roster('csv', path=path)
+        self.assertEqual(roster, [self._row('Roster CSV', u0.login, [u1.login], [u2.login], ['res.partner'])])
+
+    def test_csv_with_misspelled_header(self):
+        path = self._write_csv("team,leader,members,approvers\nRoster CSV,roster_user_0,,\n")
+        with self.assertRaises(UserError):
+            self.Roster._fetch_roster('csv', path=path)
+
+    def test_csv_with_semicolon_delimiter(self):
+        path = self._write_csv("name;leader;members;approvers\nRoster CSV;roster_user_0;;\n")
+        with self.assertRaises(UserError):
+            self.Roster._fetch_roster('csv', path=path)
+
+    def test_archive_missing_refuses_empty_roster(self):
+        u0, _u1, _u2, _u3, _u4 = self.users
+        self.Roster._sync([self._row('Roster Survivor', u0.login)])
+        with self.assertRaises(UserError):
+            self.Roster._sync([], archive_missing=True)
+        self.assertTrue(self._team('Roster Survivor').active)
+
+    def test_sync_rejects_unknown_users(self):
+        with self.assertRaises(UserError):
+            self.Roster._sync([self._row('Roster Unknown', 'no_such_login')])